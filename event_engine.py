@@ -0,0 +1,150 @@
+import math
+from operator import attrgetter
+
+# =============================================================================
+#  TIMING WHEEL
+# =============================================================================
+
+class TimingWheel:
+    """Hierarchical timing wheel keyed by integer ticks.
+
+    Level L has `slots` buckets, each spanning slots**L ticks. A timer is filed
+    at the coarsest level that still separates it from `now` and is cascaded one
+    level down whenever the level below wraps around, so inserting is O(1) and a
+    timer is moved at most `levels` times before it fires.
+    """
+    def __init__(self, slots=256, levels=4):
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.bits = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.levels = levels
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.counts = [0] * levels
+        self.occupied = 0  # bitmap of non-empty level-0 buckets
+        self.horizon = 1 << (self.bits * levels)
+        self.now = 0
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def add(self, tick, item):
+        delta = tick - self.now
+        if delta < 0: tick, delta = self.now, 0
+        if delta >= self.horizon:
+            raise ValueError(f"Timer {delta} ticks ahead is beyond the wheel horizon")
+        level = max(delta.bit_length() - 1, 0) // self.bits
+        idx = (tick >> (self.bits * level)) & self.mask
+        self.wheels[level][idx].append((tick, item))
+        self.counts[level] += 1
+        if not level: self.occupied |= 1 << idx
+
+    def _cascade(self):
+        # Called on a level-0 wrap: refile the current bucket of every level that
+        # wrapped with it, highest first so entries can fall through several levels
+        top = 1
+        while top < self.levels - 1 and not self.now & ((1 << (self.bits * (top + 1))) - 1):
+            top += 1
+        for level in range(top, 0, -1):
+            idx = (self.now >> (self.bits * level)) & self.mask
+            bucket = self.wheels[level][idx]
+            if not bucket: continue
+            self.wheels[level][idx] = []
+            self.counts[level] -= len(bucket)
+            for tick, item in bucket: self.add(tick, item)
+
+    def advance(self, limit=None):
+        """Move to the next tick holding timers and return (tick, items).
+        Returns None if the wheel is empty or the next timer lies past `limit`."""
+        while True:
+            idx = self.now & self.mask
+            bucket = self.wheels[0][idx]
+            if bucket:
+                self.wheels[0][idx] = []
+                self.counts[0] -= len(bucket)
+                self.occupied &= ~(1 << idx)
+                return self.now, [item for _, item in bucket]
+
+            ahead = self.occupied >> (idx + 1)
+            if ahead:
+                step = (ahead & -ahead).bit_length()
+            elif self.occupied:
+                step = self.mask + 1 - idx
+            else:
+                # Nothing due this revolution: jump straight to the next boundary
+                # of the lowest non-empty level (lower levels have nothing to do)
+                level = next((l for l in range(1, self.levels) if self.counts[l]), None)
+                if level is None: return None
+                span = 1 << (self.bits * level)
+                step = span - (self.now & (span - 1))
+
+            if limit is not None and self.now + step > limit:
+                self.now = max(self.now, limit)
+                return None
+            self.now += step
+            if not self.now & self.mask: self._cascade()
+
+
+# =============================================================================
+#  EVENT SCHEDULER
+# =============================================================================
+
+class Timer:
+    """Handle for a scheduled callback"""
+    __slots__ = ("seq", "fn", "args", "daemon", "done")
+
+    def __init__(self, seq, fn, args, daemon):
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.daemon = daemon
+        self.done = False
+
+class EventScheduler:
+    """Discrete-event loop in simulated milliseconds.
+
+    Daemon timers (periodic hellos, dead intervals, refreshes) never keep the
+    simulation alive on their own: `run` stops once only daemons are pending.
+    """
+    def __init__(self, tick_ms=0.01, slots=256, levels=4):
+        self.tick_ms = tick_ms
+        self.wheel = TimingWheel(slots, levels)
+        self.seq = 0
+        self.pending = 0
+        self.fired = 0
+
+    @property
+    def now(self):
+        return self.wheel.now * self.tick_ms
+
+    def schedule(self, delay_ms, fn, *args, daemon=False):
+        if not math.isfinite(delay_ms) or delay_ms < 0:
+            raise ValueError(f"Event delay must be a finite number of ms >= 0, got {delay_ms!r}")
+        self.seq += 1
+        t = Timer(self.seq, fn, args, daemon)
+        self.wheel.add(self.wheel.now + round(delay_ms / self.tick_ms), t)
+        if not daemon: self.pending += 1
+        return t
+
+    def cancel(self, t):
+        # Lazy removal: the entry stays in the wheel and is skipped when it fires
+        if t.done: return
+        t.done = True
+        if not t.daemon: self.pending -= 1
+
+    def run(self, until_ms=None, max_events=None):
+        """Fire events in time order; returns True if all non-daemon work finished"""
+        limit = None if until_ms is None else round(until_ms / self.tick_ms)
+        while self.pending:
+            if max_events is not None and self.fired >= max_events: return False
+            nxt = self.wheel.advance(limit)
+            if nxt is None: return False
+            _, batch = nxt
+            batch.sort(key=attrgetter("seq"))
+            for t in batch:
+                if t.done: continue
+                t.done = True
+                if not t.daemon: self.pending -= 1
+                self.fired += 1
+                t.fn(*t.args)
+        return True
@@ -1,10 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, simpledialog, messagebox
+import os
 import math
+import struct
 import datetime
 
 # IMPORT LOGIC FROM THE OTHER FILE
-from network_logic import NetworkSimulator
+from network_logic import NetworkSimulator, TIMED_LIMIT_MS
+from snapshot import save_snapshot, load_snapshot, snapshot_path, prune_snapshots
 
 # =============================================================================
 #  VISUAL THEME
@@ -33,6 +36,10 @@ THEME = {
 ANIMATION_SPEED_MS = 20
 PACKET_PIXELS_PER_FRAME = 9.0
 
+# Converged-state cache (one snapshot file per topology/protocol fingerprint)
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".nexus_cache")
+SNAPSHOT_KEEP = 32 # most recently used snapshots kept in SNAPSHOT_DIR
+
 # =============================================================================
 #  GUI CLASSES
 # =============================================================================
@@ -72,7 +79,7 @@ class ModernApp:
         self.packets = []
         
         self._build_layout()
-        self._refresh_sim()
+        self._refresh_sim(use_snapshot=True)
 
     def _build_layout(self):
         # 1. Header
@@ -127,6 +134,14 @@ class ModernApp:
                             activeforeground="white", command=self._on_config_change)
         cb.pack(pady=10, anchor="w", padx=20)
         
+        # Engine Switch
+        self.var_timed = tk.BooleanVar(value=False)
+        cb = tk.Checkbutton(parent, text="Timed Engine (Link Delays)", variable=self.var_timed, 
+                            bg=THEME['panel_bg'], fg=THEME['text_main'], 
+                            selectcolor=THEME['window_bg'], activebackground=THEME['panel_bg'], 
+                            activeforeground="white", command=self._on_config_change)
+        cb.pack(pady=(0,10), anchor="w", padx=20)
+        
         self._spacer(parent)
         self._lbl_header(parent, "ACTIONS")
         
@@ -144,6 +159,8 @@ class ModernApp:
         self._lbl_header(parent, "MANIPULATION")
         ModernButton(parent, "❌ Toggle Link", self._action_toggle_link, THEME['accent_danger'])
         ModernButton(parent, "💲 Change Cost", self._action_change_cost, "#64748B")
+        ModernButton(parent, "⏱ Change Delay", self._action_change_delay, "#64748B")
+        ModernButton(parent, "⏲ Schedule Failure", self._action_schedule_failure, "#64748B")
 
     def _build_right_panel(self, parent):
         # Routing Table
@@ -187,11 +204,31 @@ class ModernApp:
         self.sim.load_scenario(self.var_scen.get())
         self.sim.protocol = self.var_proto.get()
         self.sim.areas_enabled = self.var_area.get()
+        self.sim.timed = self.var_timed.get()
         self.selected_router = None
-        self._refresh_sim()
-
-    def _refresh_sim(self):
-        logs = self.sim.run_simulation()
+        self._refresh_sim(use_snapshot=True)
+
+    def _refresh_sim(self, use_snapshot=False):
+        # Snapshots are only looked up for freshly loaded scenarios, so only those
+        # are cached; manipulated topologies would never be read back
+        logs, notes = None, []
+        if use_snapshot:
+            path = snapshot_path(self.sim, SNAPSHOT_DIR)
+            if os.path.exists(path):
+                try:
+                    logs = load_snapshot(self.sim, path)
+                    os.utime(path) # mark as recently used for pruning
+                except (OSError, ValueError, struct.error) as e:
+                    notes.append(f"Ignoring cached snapshot: {e}")
+        if logs is None:
+            logs = notes + self.sim.run_simulation()
+            if use_snapshot:
+                try:
+                    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+                    save_snapshot(self.sim, path)
+                    prune_snapshots(SNAPSHOT_DIR, SNAPSHOT_KEEP)
+                except OSError as e:
+                    logs.append(f"Snapshot not saved: {e}")
         self.log_view.delete("1.0", "end")
         for l in logs: self._log(l)
         self._animate_loop()
@@ -370,6 +407,37 @@ class ModernApp:
                 l = self.sim.get_link(parts[0], parts[1])
                 if l: l.cost = int(parts[2]); self._refresh_sim()
 
+    def _action_change_delay(self):
+        res = simpledialog.askstring("Action", "Enter Delay in ms (e.g. A-B-20)")
+        if res:
+            parts = res.upper().split('-')
+            if len(parts) == 3:
+                l = self.sim.get_link(parts[0], parts[1])
+                try: delay = float(parts[2])
+                except ValueError: delay = None
+                if not l or delay is None or not math.isfinite(delay) or delay < 0:
+                    messagebox.showerror("Input Error", "Invalid link or delay (must be a finite number of ms >= 0)")
+                    return
+                l.delay = delay; self._refresh_sim()
+
+    def _action_schedule_failure(self):
+        if not self.sim.timed:
+            messagebox.showerror("Timed Engine Off", "Link failures only apply with the Timed Engine enabled")
+            return
+        res = simpledialog.askstring("Action", "Fail link at T s, optionally restore at U s (e.g. A-B-20 or A-B-20-60)")
+        if res:
+            parts = res.upper().split('-')
+            if len(parts) in (3, 4):
+                l = self.sim.get_link(parts[0], parts[1])
+                try: times = [float(p) * 1000 for p in parts[2:]]
+                except ValueError: times = None
+                if not l or not times or not all(math.isfinite(t) and 0 <= t < TIMED_LIMIT_MS for t in times):
+                    messagebox.showerror("Input Error", f"Invalid link or time (must be 0 <= T < {TIMED_LIMIT_MS/1000:.0f} s)")
+                    return
+                self.sim.fail_link(l, times[0])
+                if len(times) == 2: self.sim.restore_link(l, times[1])
+                self._refresh_sim()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = ModernApp(root)
@@ -2,10 +2,32 @@ import math
 import heapq
 import datetime
 import copy
+import hashlib
 from typing import Dict, List, Tuple, Optional
 
+from event_engine import EventScheduler
+
 # Constants used in logic
 INFINITY = 9999
+ENGINE_VERSION = 2 # bump when protocol logic changes, to invalidate cached snapshots
+
+# Timed engine defaults (milliseconds of simulated time)
+DEFAULT_LINK_DELAY_MS = 1.0
+HELLO_INTERVAL_MS = 10000
+DEAD_INTERVAL_MS = 40000
+MIN_LS_INTERVAL_MS = 5000
+SPF_DELAY_MS = 200
+RIP_UPDATE_MS = 30000
+RIP_TRIGGER_MS = 1000
+RIP_TIMEOUT_MS = 180000
+BGP_KEEPALIVE_MS = 30000
+BGP_HOLD_MS = 90000
+BGP_MRAI_MS = 30000
+TIMED_LIMIT_MS = 3600 * 1000
+TIMELINE_LOG_LINES = 20
+TIMERS = (DEFAULT_LINK_DELAY_MS, HELLO_INTERVAL_MS, DEAD_INTERVAL_MS, MIN_LS_INTERVAL_MS,
+          SPF_DELAY_MS, RIP_UPDATE_MS, RIP_TRIGGER_MS, RIP_TIMEOUT_MS,
+          BGP_KEEPALIVE_MS, BGP_HOLD_MS, BGP_MRAI_MS, TIMED_LIMIT_MS)
 
 class LSA:
     """Link State Advertisement Packet"""
@@ -64,14 +86,29 @@ class Router:
         self.lsa_seq += 1
         return LSA(self.id, self.lsa_seq, neighbors, self.area_id)
 
+def check_ms(value, what):
+    """Return `value` as float ms, or raise ValueError unless it is finite and >= 0"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"{what} must be a finite number of ms >= 0, got {value!r}")
+    return float(value)
+
 class Link:
     """Physical Connection"""
-    def __init__(self, r1, r2, cost):
+    def __init__(self, r1, r2, cost, delay=DEFAULT_LINK_DELAY_MS):
         self.r1 = r1
         self.r2 = r2
         self.cost = cost
+        self.delay = delay # one-way propagation delay (ms)
         self.active = True
 
+    @property
+    def delay(self):
+        return self._delay
+
+    @delay.setter
+    def delay(self, value):
+        self._delay = check_ms(value, f"Delay of link {self.r1}-{self.r2}")
+
 class NetworkSimulator:
     """The Brain: Handles protocol execution and topology"""
     def __init__(self):
@@ -79,13 +116,20 @@ class NetworkSimulator:
         self.links = []
         self.protocol = "Link-State (OSPF)"
         self.areas_enabled = False
+        self.timed = False
+        self.metrics = {}
+        self.link_events = [] # [(at_ms, r1, r2, up)] replayed by every timed run
         self.scenario = "Complex (Default)"
+        self.last_logs = []
         self.load_scenario(self.scenario)
 
     def load_scenario(self, name):
         self.scenario = name
-        self.routers.clear()
-        self.links.clear()
+        self.routers = {}
+        self.links = []
+        self.last_logs = []
+        self.metrics = {}
+        self.link_events = []
         
         if name == "Simple Ring":
             nodes = ['A', 'B', 'C', 'D', 'E']
@@ -132,12 +176,43 @@ class NetworkSimulator:
             if (l.r1==r1 and l.r2==r2) or (l.r1==r2 and l.r2==r1): return l
         return None
 
+    def fail_link(self, link, at_ms):
+        """Silently take `link` down `at_ms` into each timed run (no carrier loss:
+        neighbors only notice through their dead/hold/route timeouts)"""
+        self._add_link_event(link, at_ms, False)
+
+    def restore_link(self, link, at_ms):
+        self._add_link_event(link, at_ms, True)
+
+    def _add_link_event(self, link, at_ms, up):
+        at_ms = check_ms(at_ms, "Link event time")
+        if at_ms >= TIMED_LIMIT_MS:
+            raise ValueError(f"Link event time must be below the {TIMED_LIMIT_MS/1000:.0f}s run limit, got {at_ms!r}")
+        self.link_events.append((at_ms, link.r1, link.r2, up))
+
+    def topology_key(self):
+        """Fingerprint of everything that determines the converged state"""
+        h = hashlib.sha1(f"v{ENGINE_VERSION}|{TIMERS}|{self.protocol}|{self.areas_enabled}|{self.timed}".encode())
+        for rid, r in sorted(self.routers.items(), key=lambda kv: kv[0]):
+            h.update(f"|R:{rid},{float(r.x)},{float(r.y)},{r.area_id},{r.is_abr}".encode())
+        for l in self.links:
+            h.update(f"|L:{l.r1},{l.r2},{l.cost},{float(l.delay)},{l.active}".encode())
+        for ev in self.link_events:
+            h.update(f"|E:{ev}".encode())
+        return h.hexdigest()
+
     def run_simulation(self):
+        # Snapshot-backed maps are read-only; a fresh run starts from plain containers
+        self.routers = dict(self.routers.items())
+        self.links = list(self.links)
+        self.metrics = {}
         for r in self.routers.values(): r.reset()
-        if self.protocol == "Link-State (OSPF)": return self._run_ospf()
-        elif "RIP" in self.protocol: return self._run_rip()
-        elif "BGP" in self.protocol: return self._run_bgp()
-        return []
+        if self.protocol == "Link-State (OSPF)": engine = self._run_ospf_timed if self.timed else self._run_ospf
+        elif "RIP" in self.protocol: engine = self._run_rip_timed if self.timed else self._run_rip
+        elif "BGP" in self.protocol: engine = self._run_bgp_timed if self.timed else self._run_bgp
+        else: engine = None
+        self.last_logs = engine() if engine else []
+        return self.last_logs
 
     # --- OSPF IMPLEMENTATION ---
     def _run_ospf(self):
@@ -158,20 +233,8 @@ class NetworkSimulator:
             sum_q = []
             abrs = [r for r in self.routers.values() if r.is_abr]
             for abr in abrs:
-                g = abr.lsdb.get_graph()
-                dists, _ = self._dijkstra(g, abr.id)
-                
-                # Area 1 -> 0
-                s0 = [(d, dists[d]) for d,r in self.routers.items() if r.area_id!=0 and d in dists and dists[d]<INFINITY]
-                if s0:
-                    l = LSA(f"{abr.id}-SUM-A0", 1, s0+[(abr.id,0)], 0)
-                    l.is_summary = True
-                    sum_q.append({'from':abr.id, 'lsa':l})
-                
-                # Area 0 -> 1
-                s1 = [(d, dists[d]) for d,r in self.routers.items() if r.area_id!=1 and d in dists and dists[d]<INFINITY]
-                if s1:
-                    l = LSA(f"{abr.id}-SUM-A1", 1, s1+[(abr.id,0)], 1)
+                for area, nbrs in self._abr_summaries(abr).items():
+                    l = LSA(f"{abr.id}-SUM-A{area}", 1, nbrs, area)
                     l.is_summary = True
                     sum_q.append({'from':abr.id, 'lsa':l})
             
@@ -185,44 +248,64 @@ class NetworkSimulator:
             
         # 3. Dijkstra Calculation
         logs.append("Calculating Shortest Paths...")
-        for rid, r in self.routers.items():
-            g = r.lsdb.get_graph()
-            
-            # FIX: Inject Link from ABR to Summary Node
-            for n in list(g.keys()):
-                if "SUM" in n:
-                    abr = n.split("-")[0]
-                    if abr in g: g[abr][n] = 0
-            
-            dists, parents = self._dijkstra(g, rid)
-            
-            for dest in self.routers:
-                if dest == rid:
-                    r.routing_table[dest] = ("Local", 0)
-                    continue
-                
-                # Try direct path
-                nh, cost = None, INFINITY
-                if dest in dists:
-                    cost = dists[dest]
-                    nh = self._get_nh(rid, dest, parents)
-                else:
-                    # Try via Summary
-                    best_sc, best_sn = INFINITY, None
-                    for n in g:
-                        if "SUM" in n and dest in g[n] and n in dists:
-                            tc = dists[n] + g[n][dest]
-                            if tc < best_sc: best_sc, best_sn = tc, n
-                    if best_sc < INFINITY:
-                        cost = best_sc
-                        nh = self._get_nh(rid, best_sn, parents)
-                
-                if nh: r.routing_table[dest] = (nh, int(cost))
-                else: r.routing_table[dest] = ("?", "∞")
+        for r in self.routers.values(): self._ospf_table(r)
         
         logs.append("Convergence Complete.")
         return logs
 
+    def _abr_summaries(self, abr):
+        """Summary LSA contents an ABR advertises into each area: {area: neighbors}"""
+        g = abr.lsdb.get_graph()
+        dists, _ = self._dijkstra(g, abr.id)
+        out = {}
+        
+        # Area 1 -> 0
+        s0 = [(d, dists[d]) for d,r in self.routers.items() if r.area_id!=0 and d in dists and dists[d]<INFINITY]
+        if s0: out[0] = s0+[(abr.id,0)]
+        
+        # Area 0 -> 1
+        s1 = [(d, dists[d]) for d,r in self.routers.items() if r.area_id!=1 and d in dists and dists[d]<INFINITY]
+        if s1: out[1] = s1+[(abr.id,0)]
+        return out
+
+    def _ospf_table(self, r):
+        """Run SPF over the router's LSDB and rebuild its routing table"""
+        rid = r.id
+        r.routing_table = {}
+        g = r.lsdb.get_graph()
+        
+        # FIX: Inject Link from ABR to Summary Node
+        for n in list(g.keys()):
+            if "SUM" in n:
+                abr = n.split("-")[0]
+                if abr in g: g[abr][n] = 0
+        
+        dists, parents = self._dijkstra(g, rid)
+        
+        for dest in self.routers:
+            if dest == rid:
+                r.routing_table[dest] = ("Local", 0)
+                continue
+            
+            # Try direct path
+            nh, cost = None, INFINITY
+            if dest in dists:
+                cost = dists[dest]
+                nh = self._get_nh(rid, dest, parents)
+            else:
+                # Try via Summary
+                best_sc, best_sn = INFINITY, None
+                for n in g:
+                    if "SUM" in n and dest in g[n] and n in dists:
+                        tc = dists[n] + g[n][dest]
+                        if tc < best_sc: best_sc, best_sn = tc, n
+                if best_sc < INFINITY:
+                    cost = best_sc
+                    nh = self._get_nh(rid, best_sn, parents)
+            
+            if nh: r.routing_table[dest] = (nh, int(cost))
+            else: r.routing_table[dest] = ("?", "∞")
+
     def _flood(self, queue, logs, phase):
         q = copy.copy(queue)
         seen = set()
@@ -237,17 +320,18 @@ class NetworkSimulator:
             snd = self.routers[pkt['from']]
             lsa = pkt['lsa']
             
-            accept = False
-            if not self.areas_enabled: accept = True
-            elif lsa.is_summary: accept = (lsa.area_id == rcv.area_id)
-            elif lsa.area_id == rcv.area_id or rcv.is_abr or snd.is_abr: accept = True
-            
-            if accept and rcv.lsdb.update(lsa):
+            if self._accepts(rcv, snd, lsa) and rcv.lsdb.update(lsa):
                 count += 1
                 for nid, _ in self.get_neighbors(rcv.id):
                     if nid != snd.id: q.append({'from':rcv.id, 'to':nid, 'lsa':lsa})
         logs.append(f"[{phase}] Processed {count} updates.")
 
+    def _accepts(self, rcv, snd, lsa):
+        """Area scoping: may `rcv` install an LSA handed over by `snd`?"""
+        if not self.areas_enabled: return True
+        if lsa.is_summary: return lsa.area_id == rcv.area_id
+        return lsa.area_id == rcv.area_id or rcv.is_abr or snd.is_abr
+
     def _dijkstra(self, graph, start):
         d = {n: float('inf') for n in graph}
         d[start] = 0
@@ -316,4 +400,317 @@ class NetworkSimulator:
                             r.routing_table[d] = (nid, f"Len:{len(newp)}")
                             changed=True
         logs.append(f"BGP Converged in {i} steps.")
-        return logs
\ No newline at end of file
+        return logs
+
+    # --- TIMED (DISCRETE-EVENT) ENGINE ---
+    def _start_timed(self, detect_ms, rediscover_ms):
+        self.events = EventScheduler()
+        self.metrics = {'messages': {}, 'dropped': 0, 'last_change_ms': 0.0, 'timeline': []}
+        # Adjacency over every link in link order: {rid: {nid: Link}};
+        # links currently down (inactive at t=0 or failed mid-run) are in _down
+        self._adj = {rid: {} for rid in self.routers}
+        self._down = set()
+        for l in self.links:
+            self._adj[l.r1][l.r2] = l
+            self._adj[l.r2][l.r1] = l
+            if not l.active: self._down.add(l)
+        for at, r1, r2, up in sorted(self.link_events, key=lambda e: e[0]):
+            l = self.get_link(r1, r2)
+            # Events past the run limit could never fire (and may overflow the wheel)
+            if l is None or at >= TIMED_LIMIT_MS: continue
+            self.events.schedule(at, self._on_link_event, l, up)
+            # Keep the run open long enough for the protocol to notice the change
+            self.events.schedule(at + (rediscover_ms if up else detect_ms), self._idle)
+
+    def _idle(self):
+        pass
+
+    def _on_link_event(self, l, up):
+        if up: self._down.discard(l)
+        else: self._down.add(l)
+        self._timeline(f"link {l.r1}-{l.r2} {'up' if up else 'down'}")
+
+    def _timeline(self, msg):
+        self.metrics['timeline'].append(f"t={self.events.now/1000:.3f}s {msg}")
+
+    def _send(self, src, dst, kind, handler, *args, daemon=False):
+        """Deliver a protocol message to handler(src, dst, *args) after the link delay"""
+        l = self._adj[src][dst]
+        if l in self._down:
+            self.metrics['dropped'] += 1
+            return
+        msgs = self.metrics['messages']
+        msgs[kind] = msgs.get(kind, 0) + 1
+        self.events.schedule(l.delay, handler, src, dst, *args, daemon=daemon)
+
+    def _note_change(self):
+        self.metrics['last_change_ms'] = self.events.now
+
+    def _finish_timed(self, logs, name):
+        settled = self.events.run(until_ms=TIMED_LIMIT_MS)
+        m = self.metrics
+        conv, quiet = m['last_change_ms'], self.events.now
+        total = sum(m['messages'].values())
+        m.update(convergence_ms=conv, quiet_ms=quiet, total_messages=total,
+                 events=self.events.fired, msg_rate=total / (quiet / 1000) if quiet else 0.0)
+        kinds = ", ".join(f"{k} {v}" for k, v in sorted(m['messages'].items()))
+        logs.extend(m['timeline'][:TIMELINE_LOG_LINES])
+        if len(m['timeline']) > TIMELINE_LOG_LINES:
+            logs.append(f"... {len(m['timeline']) - TIMELINE_LOG_LINES} more timeline entries")
+        if settled: logs.append(f"{name} Converged at t={conv/1000:.3f}s (quiet at {quiet/1000:.3f}s).")
+        else: logs.append(f"{name} still busy at t={quiet/1000:.3f}s, last change {conv/1000:.3f}s.")
+        logs.append(f"Messages: {total} ({kinds}) | dropped {m['dropped']} | "
+                    f"{m['msg_rate']:.1f} msg/s | {self.events.fired} events")
+        return logs
+
+    # Neighbor liveness shared by OSPF (hello/dead) and BGP (keepalive/hold)
+    def _start_hellos(self, kind, interval, dead, on_up, on_down):
+        self._hello = (kind, interval, dead, on_up, on_down)
+        self._nbrs = {rid: {} for rid in self.routers} # {rid: {nid: dead timer}}
+        for rid in self.routers: self._send_hellos(rid, periodic=False)
+
+    def _send_hellos(self, rid, periodic=True):
+        kind, interval = self._hello[:2]
+        for nid in self._adj[rid]:
+            self._send(rid, nid, kind, self._on_hello, daemon=periodic)
+        self.events.schedule(interval, self._send_hellos, rid, daemon=True)
+
+    def _on_hello(self, src, dst):
+        _, _, dead, on_up, _ = self._hello
+        nbrs = self._nbrs[dst]
+        timer = nbrs.get(src)
+        if timer: self.events.cancel(timer)
+        nbrs[src] = self.events.schedule(dead, self._on_dead, dst, src, daemon=True)
+        if not timer:
+            if self.events.now >= self._hello[1]: self._timeline(f"{dst}: neighbor {src} up")
+            on_up(dst, src)
+
+    def _on_dead(self, rid, nid):
+        del self._nbrs[rid][nid]
+        self._timeline(f"{rid}: no {self._hello[0]} from {nid}, neighbor down")
+        self._hello[4](rid, nid)
+
+    # OSPF: hellos bring adjacencies up, LSAs are paced per router and SPF is delayed
+    def _run_ospf_timed(self):
+        logs = [f"Initialized timed OSPF. Areas: {self.areas_enabled}"]
+        self._start_timed(DEAD_INTERVAL_MS + HELLO_INTERVAL_MS, 2 * HELLO_INTERVAL_MS)
+        self._ospf = {rid: {'lsa_timer': None, 'last_lsa': None, 'spf_timer': None} for rid in self.routers}
+        for rid in self.routers: self._ospf_originate(rid)
+        self._start_hellos("HELLO", HELLO_INTERVAL_MS, DEAD_INTERVAL_MS,
+                           self._ospf_on_adjacency, self._ospf_on_adjacency_lost)
+        return self._finish_timed(logs, "OSPF")
+
+    def _ospf_on_adjacency(self, rid, nid):
+        # New adjacency: hand over our database and re-advertise our links
+        self._send(rid, nid, "LSU", self._ospf_on_lsu, list(self.routers[rid].lsdb.database.values()))
+        self._ospf_originate(rid)
+
+    def _ospf_on_adjacency_lost(self, rid, nid):
+        self._ospf_originate(rid)
+
+    def _ospf_originate(self, rid):
+        st = self._ospf[rid]
+        if st['lsa_timer']: return # pending origination will pick up the change
+        wait = 0 if st['last_lsa'] is None else max(0, st['last_lsa'] + MIN_LS_INTERVAL_MS - self.events.now)
+        st['lsa_timer'] = self.events.schedule(wait, self._ospf_on_originate, rid)
+
+    def _ospf_on_originate(self, rid):
+        st = self._ospf[rid]
+        st['lsa_timer'], st['last_lsa'] = None, self.events.now
+        nbrs = [(nid, l.cost) for nid, l in self._adj[rid].items() if nid in self._nbrs[rid]]
+        self._ospf_install(rid, None, self.routers[rid].create_lsa(nbrs))
+
+    def _ospf_install(self, rid, sender, lsa):
+        if not self.routers[rid].lsdb.update(lsa): return
+        for nid in self._nbrs[rid]:
+            if nid != sender: self._send(rid, nid, "LSU", self._ospf_on_lsu, [lsa])
+        st = self._ospf[rid]
+        if not st['spf_timer']:
+            st['spf_timer'] = self.events.schedule(SPF_DELAY_MS, self._ospf_on_spf, rid)
+
+    def _ospf_on_lsu(self, src, dst, lsas):
+        rcv, snd = self.routers[dst], self.routers[src]
+        for lsa in lsas:
+            if self._accepts(rcv, snd, lsa): self._ospf_install(dst, src, lsa)
+
+    def _ospf_on_spf(self, rid):
+        self._ospf[rid]['spf_timer'] = None
+        r = self.routers[rid]
+        old = r.routing_table
+        self._ospf_table(r)
+        if r.routing_table != old: self._note_change()
+        if self.areas_enabled and r.is_abr:
+            for area, nbrs in self._abr_summaries(r).items():
+                sid = f"{rid}-SUM-A{area}"
+                prev = r.lsdb.database.get(sid)
+                if prev and prev.neighbors == nbrs: continue
+                l = LSA(sid, prev.seq_num + 1 if prev else 1, nbrs, area)
+                l.is_summary = True
+                self._ospf_install(rid, None, l)
+
+    # RIP: periodic and triggered updates with poisoned reverse; routes that
+    # are not refreshed by their next hop within RIP_TIMEOUT_MS are invalidated
+    def _run_rip_timed(self):
+        logs = ["Starting timed RIP..."]
+        self._start_timed(RIP_TIMEOUT_MS + RIP_UPDATE_MS, 2 * RIP_UPDATE_MS)
+        # Every loop-free path is cheaper than all links together, so this
+        # bounds counting to infinity without capping any real route
+        self._rip_inf = min(INFINITY, sum(l.cost for l in self.links) + 1)
+        self._rip_trigger = {}
+        self._rip_heard = {rid: {} for rid in self.routers} # {rid: {dest: last refresh}}
+        for r in self.routers.values():
+            r.distance_vector = {r.id:(0,'Local')}
+            for n, l in self._adj[r.id].items():
+                if l in self._down: continue
+                r.distance_vector[n] = (l.cost, n)
+                self._rip_refresh(r.id, n)
+            self._rip_sync_table(r)
+        for rid in self.routers:
+            self._rip_update(rid, periodic=False)
+            self.events.schedule(RIP_UPDATE_MS, self._rip_update, rid, daemon=True)
+        return self._finish_timed(logs, "RIP")
+
+    def _rip_sync_table(self, r):
+        r.routing_table = {d: (nh, c) if c < self._rip_inf else ("?", "∞")
+                           for d, (c, nh) in r.distance_vector.items()}
+
+    def _rip_update(self, rid, periodic=True):
+        if not periodic: self._rip_trigger.pop(rid, None)
+        vec = dict(self.routers[rid].distance_vector)
+        for nid in self._adj[rid]:
+            self._send(rid, nid, "RIP", self._rip_on_update, vec, daemon=periodic)
+        if periodic: self.events.schedule(RIP_UPDATE_MS, self._rip_update, rid, daemon=True)
+
+    def _rip_trigger_update(self, rid):
+        if rid not in self._rip_trigger:
+            self._rip_trigger[rid] = self.events.schedule(RIP_TRIGGER_MS, self._rip_update, rid, False)
+
+    def _rip_refresh(self, rid, d):
+        # One armed timer per route; refreshes only stamp the time and the
+        # timer re-arms itself on expiry if the route was heard since
+        heard = self._rip_heard[rid]
+        if d not in heard:
+            self.events.schedule(RIP_TIMEOUT_MS, self._rip_on_timeout, rid, d, daemon=True)
+        heard[d] = self.events.now
+
+    def _rip_on_update(self, src, dst, vec):
+        r = self.routers[dst]
+        dv, table, heard = r.distance_vector, r.routing_table, self._rip_heard[dst]
+        cost, inf, now = self._adj[dst][src].cost, self._rip_inf, self.events.now
+        changed = False
+        for d, (m, snh) in vec.items():
+            if d == dst: continue
+            # Poisoned reverse: routes the sender learned from us count as unreachable
+            new = inf if snh == dst else cost+m
+            if new > inf: new = inf
+            cur, nh = dv.get(d, (inf, None))
+            if nh == src:
+                # The current next hop is authoritative, even when the route got worse
+                if new < inf:
+                    if d in heard: heard[d] = now
+                    else: self._rip_refresh(dst, d)
+                if new == cur: continue
+            elif new >= cur: continue
+            else: self._rip_refresh(dst, d)
+            dv[d] = (new, src)
+            table[d] = (src, new) if new < inf else ("?", "∞")
+            changed = True
+        if not changed: return
+        self._note_change()
+        self._rip_trigger_update(dst)
+
+    def _rip_on_timeout(self, rid, d):
+        heard = self._rip_heard[rid]
+        left = heard[d] + RIP_TIMEOUT_MS - self.events.now
+        if left > 0:
+            self.events.schedule(left, self._rip_on_timeout, rid, d, daemon=True)
+            return
+        del heard[d]
+        r = self.routers[rid]
+        c, nh = r.distance_vector[d]
+        if c >= self._rip_inf: return
+        r.distance_vector[d] = (self._rip_inf, nh)
+        self._timeline(f"{rid}: route to {d} via {nh} timed out")
+        self._rip_sync_table(r)
+        self._note_change()
+        self._rip_trigger_update(rid)
+
+    # BGP: sessions kept alive by KEEPALIVE/hold timers, full-table updates
+    # rate-limited by MRAI, best path re-selected from each peer's last update
+    def _run_bgp_timed(self):
+        logs = ["Starting timed BGP..."]
+        self._start_timed(BGP_HOLD_MS + BGP_KEEPALIVE_MS, 2 * BGP_KEEPALIVE_MS)
+        self._bgp = {rid: {'timer': None, 'ready_at': 0.0, 'rib': {}} for rid in self.routers}
+        for r in self.routers.values():
+            r.bgp_paths = {r.id:[r.id]}
+            r.routing_table[r.id] = ("Local", "AS:[]")
+        self._start_hellos("KEEPALIVE", BGP_KEEPALIVE_MS, BGP_HOLD_MS,
+                           self._bgp_on_session_up, self._bgp_on_session_down)
+        return self._finish_timed(logs, "BGP")
+
+    def _bgp_table(self, rid):
+        return {d: list(p) for d, p in self.routers[rid].bgp_paths.items()}
+
+    def _bgp_on_session_up(self, rid, nid):
+        # A new session starts with our full table, outside of MRAI
+        self._send(rid, nid, "UPDATE", self._bgp_on_update, self._bgp_table(rid))
+
+    def _bgp_on_session_down(self, rid, nid):
+        self._bgp[rid]['rib'].pop(nid, None)
+        r = self.routers[rid]
+        lost = [d for d, (nh, _) in r.routing_table.items() if nh == nid]
+        if self._bgp_select(rid, lost):
+            self._note_change()
+            self._bgp_advertise(rid)
+
+    def _bgp_advertise(self, rid):
+        st = self._bgp[rid]
+        if st['timer']: return # already queued behind MRAI
+        st['timer'] = self.events.schedule(max(0, st['ready_at'] - self.events.now), self._bgp_on_mrai, rid)
+
+    def _bgp_on_mrai(self, rid):
+        st = self._bgp[rid]
+        st['timer'], st['ready_at'] = None, self.events.now + BGP_MRAI_MS
+        paths = self._bgp_table(rid)
+        for nid in self._nbrs[rid]:
+            self._send(rid, nid, "UPDATE", self._bgp_on_update, paths)
+
+    def _bgp_on_update(self, src, dst, paths):
+        rib = self._bgp[dst]['rib']
+        old = rib.get(src, {})
+        rib[src] = paths
+        r = self.routers[dst]
+        affected = []
+        for d in list(paths) + [d for d in old if d not in paths]:
+            if d == dst: continue
+            p, curr = paths.get(d), r.bgp_paths.get(d)
+            via_src = d in r.routing_table and r.routing_table[d][0] == src
+            if via_src or (p and dst not in p and (not curr or len(p)+1 < len(curr))):
+                affected.append(d)
+        if self._bgp_select(dst, affected):
+            self._note_change()
+            self._bgp_advertise(dst)
+
+    def _bgp_select(self, rid, dests):
+        """Shortest loop-free path per destination; ties keep the current next hop"""
+        r, rib = self.routers[rid], self._bgp[rid]['rib']
+        changed = False
+        for d in dests:
+            cur = r.routing_table[d][0] if d in r.routing_table else None
+            best, best_nh = None, None
+            for nid in self._adj[rid]:
+                p = rib.get(nid, {}).get(d)
+                if not p or rid in p: continue
+                if best is None or len(p) < len(best) or (len(p) == len(best) and nid == cur):
+                    best, best_nh = p, nid
+            if best is None:
+                if d in r.bgp_paths:
+                    del r.bgp_paths[d], r.routing_table[d]
+                    changed = True
+                continue
+            newp = [rid]+best
+            if r.bgp_paths.get(d) != newp or cur != best_nh:
+                r.bgp_paths[d] = newp
+                r.routing_table[d] = (best_nh, f"Len:{len(newp)}")
+                changed = True
+        return changed
@@ -0,0 +1,355 @@
+import os
+import mmap
+import hashlib
+import struct
+from collections.abc import ItemsView, Mapping, Sequence, ValuesView
+
+from network_logic import LSA, Link, LinkStateDB, Router
+
+# =============================================================================
+#  ON-DISK LAYOUT
+# =============================================================================
+# Every section is a packed array of fixed-size little-endian records, so a
+# router can be located and decoded straight out of the memory map without
+# touching any other router. All text (ids, next hops, metrics, logs) lives
+# once in a shared string table and records refer to it by index.
+MAGIC = b"NXSNAP\x00\x03"
+
+HEADER = struct.Struct("<8s19I")   # magic + counts/offsets (see save_snapshot)
+STR_OFF = struct.Struct("<I")      # byte offset of string i in the blob
+ROUTER = struct.Struct("<IddiiiIIII")  # id, x, y, area, abr, seq, rt[start,n], lsa[start,n]
+LINK = struct.Struct("<IIiid")     # r1, r2, cost, active, delay
+ROUTE = struct.Struct("<IIii")     # dest, next hop, metric kind, metric value
+LSA_REC = struct.Struct("<IiiiII") # origin, seq, area, summary, nb[start,n]
+NEIGH = struct.Struct("<Ii")       # neighbor id, cost
+LOG = struct.Struct("<I")          # string index
+METRIC = struct.Struct("<IIid")    # group ("" or "messages"), name, is int, value
+
+METRIC_INT, METRIC_STR = 0, 1
+
+
+class _StringTable:
+    """Interns strings while a snapshot is being written"""
+    def __init__(self):
+        self.index = {}
+        self.items = []
+
+    def __call__(self, s):
+        s = str(s)
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.items)
+            self.items.append(s)
+        return i
+
+
+def save_snapshot(sim, path):
+    """Write the converged state of `sim` to `path` (atomically)."""
+    st = _StringTable()
+    # sorted so lookups can bisect the mapped file
+    rids = sorted(sim.routers.items(), key=lambda kv: kv[0])
+
+    routers, routes, lsas, neighs = bytearray(), bytearray(), bytearray(), bytearray()
+    n_routes = n_lsas = n_neighs = 0
+    for rid, r in rids:
+        rt_start = n_routes
+        for dest, (nh, metric) in r.routing_table.items():
+            if isinstance(metric, int): kind, val = METRIC_INT, metric
+            else: kind, val = METRIC_STR, st(metric)
+            routes += ROUTE.pack(st(dest), st(nh), kind, val)
+            n_routes += 1
+
+        lsa_start = n_lsas
+        for lsa in r.lsdb.database.values():
+            nb_start = n_neighs
+            for nid, cost in lsa.neighbors:
+                neighs += NEIGH.pack(st(nid), int(cost))
+                n_neighs += 1
+            lsas += LSA_REC.pack(st(lsa.origin_id), lsa.seq_num, lsa.area_id, lsa.is_summary,
+                                 nb_start, n_neighs - nb_start)
+            n_lsas += 1
+
+        routers += ROUTER.pack(st(rid), r.x, r.y, r.area_id, r.is_abr, r.lsa_seq,
+                               rt_start, n_routes - rt_start, lsa_start, n_lsas - lsa_start)
+
+    links = bytearray()
+    for l in sim.links:
+        links += LINK.pack(st(l.r1), st(l.r2), int(l.cost), l.active, l.delay)
+
+    logs = bytearray()
+    for msg in sim.last_logs:
+        logs += LOG.pack(st(msg))
+
+    # Numeric run metrics plus per-kind message counts; the timeline is text
+    # and already part of the logs
+    metrics = bytearray()
+    entries = [("", k, v) for k, v in sim.metrics.items()]
+    entries += [("messages", k, v) for k, v in sim.metrics.get('messages', {}).items()]
+    for group, name, v in entries:
+        if isinstance(v, bool) or not isinstance(v, (int, float)): continue
+        metrics += METRIC.pack(st(group), st(name), isinstance(v, int), v)
+
+    meta = (st(sim.scenario), st(sim.protocol), int(sim.areas_enabled), int(sim.timed),
+            st(snapshot_key(sim)))
+
+    # String table: (n+1) offsets followed by the utf-8 blob
+    blob, offs = bytearray(), bytearray()
+    for s in st.items:
+        offs += STR_OFF.pack(len(blob))
+        blob += s.encode("utf-8")
+    offs += STR_OFF.pack(len(blob))
+
+    sections = [offs, blob, routers, links, routes, lsas, neighs, logs, metrics]
+    starts, pos = [], HEADER.size
+    for sec in sections:
+        starts.append(pos)
+        pos += len(sec)
+
+    header = HEADER.pack(MAGIC, len(st.items), starts[0], starts[1],
+                         len(rids), starts[2], len(sim.links), starts[3],
+                         starts[4], starts[5], starts[6],
+                         len(logs) // LOG.size, starts[7],
+                         len(metrics) // METRIC.size, starts[8], *meta)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        for sec in sections: f.write(sec)
+    os.replace(tmp, path)
+
+
+class _Snapshot:
+    """Read-only view over a memory-mapped snapshot file"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buf) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a Nexus snapshot")
+        (magic, self.n_str, self.str_off, self.blob_off,
+         self.n_routers, self.routers_off, self.n_links, self.links_off,
+         self.routes_off, self.lsas_off, self.neighs_off,
+         self.n_logs, self.logs_off, self.n_metrics, self.metrics_off,
+         scen, proto, areas, timed, key) = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Nexus snapshot")
+        if len(self.buf) < self.metrics_off + self.n_metrics * METRIC.size:
+            raise ValueError(f"{path} is truncated")
+        self.scenario = self.string(scen)
+        self.protocol = self.string(proto)
+        self.areas_enabled = bool(areas)
+        self.timed = bool(timed)
+        self.key = self.string(key)
+
+    def string(self, i):
+        a, b = struct.unpack_from("<II", self.buf, self.str_off + i * STR_OFF.size)
+        return self.buf[self.blob_off + a:self.blob_off + b].decode("utf-8")
+
+    def router_id(self, i):
+        return self.string(STR_OFF.unpack_from(self.buf, self.routers_off + i * ROUTER.size)[0])
+
+    def find_router(self, rid):
+        """Index of router `rid`, by bisecting the sorted router records"""
+        lo, hi = 0, self.n_routers
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.router_id(mid) < rid: lo = mid + 1
+            else: hi = mid
+        if lo < self.n_routers and self.router_id(lo) == rid: return lo
+        return None
+
+    def router(self, i):
+        """Decode router i's placement only; its tables stay in the map until read"""
+        (rid, x, y, area, abr, seq,
+         rt_start, rt_n, lsa_start, lsa_n) = ROUTER.unpack_from(self.buf, self.routers_off + i * ROUTER.size)
+        r = SnapshotRouter(self.string(rid), x, y, area)
+        r.is_abr = bool(abr)
+        r.lsa_seq = seq
+        r._pending_rt = (self, rt_start, rt_n)
+        r._pending_lsdb = (self, lsa_start, lsa_n)
+        return r
+
+    def routing_table(self, start, n):
+        table = {}
+        for j in range(start, start + n):
+            dest, nh, kind, val = ROUTE.unpack_from(self.buf, self.routes_off + j * ROUTE.size)
+            metric = val if kind == METRIC_INT else self.string(val)
+            table[self.string(dest)] = (self.string(nh), metric)
+        return table
+
+    def lsdb(self, start, n):
+        db = LinkStateDB()
+        for j in range(start, start + n):
+            origin, lsa_seq, lsa_area, summary, nb_start, nb_n = \
+                LSA_REC.unpack_from(self.buf, self.lsas_off + j * LSA_REC.size)
+            nbs = []
+            for k in range(nb_start, nb_start + nb_n):
+                nid, cost = NEIGH.unpack_from(self.buf, self.neighs_off + k * NEIGH.size)
+                nbs.append((self.string(nid), cost))
+            lsa = LSA(self.string(origin), lsa_seq, nbs, lsa_area)
+            lsa.is_summary = bool(summary)
+            db.database[lsa.origin_id] = lsa
+        return db
+
+    def link(self, i):
+        r1, r2, cost, active, delay = LINK.unpack_from(self.buf, self.links_off + i * LINK.size)
+        l = Link(self.string(r1), self.string(r2), cost, delay)
+        l.active = bool(active)
+        return l
+
+    def logs(self):
+        return [self.string(LOG.unpack_from(self.buf, self.logs_off + i * LOG.size)[0])
+                for i in range(self.n_logs)]
+
+    def metrics(self):
+        m = {}
+        for i in range(self.n_metrics):
+            group, name, is_int, v = METRIC.unpack_from(self.buf, self.metrics_off + i * METRIC.size)
+            group = self.string(group)
+            target = m.setdefault(group, {}) if group else m
+            target[self.string(name)] = int(v) if is_int else v
+        return m
+
+
+class SnapshotRouter(Router):
+    """Router whose routing table and LSDB are decoded on first read"""
+    _pending_rt = _pending_lsdb = None
+
+    @property
+    def routing_table(self):
+        if self._pending_rt:
+            snap, start, n = self._pending_rt
+            self._pending_rt, self._routing_table = None, snap.routing_table(start, n)
+        return self._routing_table
+
+    @routing_table.setter
+    def routing_table(self, value):
+        self._pending_rt, self._routing_table = None, value
+
+    @property
+    def lsdb(self):
+        if self._pending_lsdb:
+            snap, start, n = self._pending_lsdb
+            self._pending_lsdb, self._lsdb = None, snap.lsdb(start, n)
+        return self._lsdb
+
+    @lsdb.setter
+    def lsdb(self, value):
+        self._pending_lsdb, self._lsdb = None, value
+
+
+class _RouterValues(ValuesView):
+    def __iter__(self):
+        m = self._mapping
+        for i in range(len(m)): yield m._at(i)
+
+class _RouterItems(ItemsView):
+    def __iter__(self):
+        m = self._mapping
+        for i in range(len(m)):
+            r = m._at(i)
+            yield r.id, r
+
+
+class SnapshotRouters(Mapping):
+    """Router map that decodes each router from the snapshot on first access"""
+    BISECT_LOOKUPS = 64 # after this many misses, index all ids in one pass
+
+    def __init__(self, snap):
+        self._snap = snap
+        self._cache = {}
+        self._index = None
+        self._misses = 0
+
+    def _find(self, rid):
+        if self._index is None:
+            self._misses += 1
+            if self._misses <= self.BISECT_LOOKUPS: return self._snap.find_router(rid)
+            self._index = {self._snap.router_id(i): i for i in range(self._snap.n_routers)}
+        return self._index.get(rid)
+
+    def __getitem__(self, rid):
+        r = self._cache.get(rid)
+        if r is None:
+            i = self._find(rid)
+            if i is None: raise KeyError(rid)
+            r = self._cache[rid] = self._snap.router(i)
+        return r
+
+    def _at(self, i):
+        # Positional access for in-order walks, sharing the per-id cache
+        rid = self._snap.router_id(i)
+        r = self._cache.get(rid)
+        if r is None: r = self._cache[rid] = self._snap.router(i)
+        return r
+
+    def __contains__(self, rid):
+        return rid in self._cache or self._find(rid) is not None
+
+    def values(self):
+        return _RouterValues(self)
+
+    def items(self):
+        return _RouterItems(self)
+
+    def __iter__(self):
+        for i in range(self._snap.n_routers): yield self._snap.router_id(i)
+
+    def __len__(self):
+        return self._snap.n_routers
+
+
+class SnapshotLinks(Sequence):
+    """Link list that decodes each link from the snapshot on first access"""
+    def __init__(self, snap):
+        self._snap = snap
+        self._cache = [None] * snap.n_links
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [self[j] for j in range(*i.indices(len(self)))]
+        l = self._cache[i]
+        if l is None:
+            l = self._cache[i] = self._snap.link(i % len(self))
+        return l
+
+    def __len__(self):
+        return self._snap.n_links
+
+
+def load_snapshot(sim, path):
+    """Point `sim` at the snapshot in `path`; routers and links load lazily.
+    Numeric metrics are restored, the timeline only as part of the logs.
+    Raises ValueError if the file is damaged or was saved for another topology."""
+    snap = _Snapshot(path)
+    if snap.key != snapshot_key(sim):
+        raise ValueError(f"{path} does not match the current topology")
+    sim.scenario = snap.scenario
+    sim.protocol = snap.protocol
+    sim.areas_enabled = snap.areas_enabled
+    sim.timed = snap.timed
+    sim.routers = SnapshotRouters(snap)
+    sim.links = SnapshotLinks(snap)
+    sim.last_logs = snap.logs()
+    sim.metrics = snap.metrics()
+    return [f"Loaded converged snapshot {os.path.basename(path)}"] + sim.last_logs
+
+
+def snapshot_key(sim):
+    """Cache key: the simulator's topology/engine fingerprint plus the file format"""
+    return hashlib.sha1(MAGIC + sim.topology_key().encode()).hexdigest()
+
+
+def snapshot_path(sim, directory):
+    """Cache location for the current topology/protocol of `sim`"""
+    return os.path.join(directory, f"{snapshot_key(sim)}.nxs")
+
+
+def prune_snapshots(directory, keep):
+    """Delete all but the `keep` most recently modified snapshots in `directory`"""
+    files = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".nxs") and entry.is_file():
+            files.append((entry.stat().st_mtime, entry.path))
+    files.sort(reverse=True)
+    for _, path in files[keep:]:
+        try: os.remove(path)
+        except OSError: pass
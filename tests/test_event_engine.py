@@ -0,0 +1,112 @@
+import heapq
+import random
+import unittest
+
+from event_engine import EventScheduler, TimingWheel
+
+
+class TimingWheelTest(unittest.TestCase):
+    """Checks the wheel against a heap of (tick, insertion order)"""
+
+    def drain(self, wheel, ref, rng, readd=0.0, limit=None):
+        fired = []
+        while True:
+            nxt = wheel.advance(limit)
+            if nxt is None: return fired
+            tick, items = nxt
+            expected = []
+            while ref and ref[0][0] == tick: expected.append(heapq.heappop(ref)[1])
+            self.assertEqual(sorted(items), sorted(expected))
+            fired.append(tick)
+            # New timers filed while the wheel is mid-walk, including at `now`
+            while rng.random() < readd:
+                t = tick + rng.choice([0, 1, 255, 256, rng.randrange(1 << 20)])
+                item = len(fired) * 1000 + len(ref)
+                wheel.add(t, item)
+                heapq.heappush(ref, (t, item))
+
+    def test_fires_in_tick_order(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            wheel, ref = TimingWheel(slots=16, levels=4), []
+            for i in range(300):
+                t = rng.choice([rng.randrange(40), rng.randrange(1 << 16)])
+                wheel.add(t, i)
+                heapq.heappush(ref, (t, i))
+            fired = self.drain(wheel, ref, rng)
+            self.assertEqual(fired, sorted(set(fired)))
+            self.assertFalse(ref)
+            self.assertEqual(len(wheel), 0)
+
+    def test_readd_during_advance(self):
+        rng = random.Random(2)
+        for _ in range(20):
+            wheel, ref = TimingWheel(), []
+            for i in range(200):
+                t = rng.randrange(1 << 22)
+                wheel.add(t, i)
+                heapq.heappush(ref, (t, i))
+            self.drain(wheel, ref, rng, readd=0.5)
+            self.assertFalse(ref)
+
+    def test_limit(self):
+        rng = random.Random(3)
+        wheel, ref = TimingWheel(slots=16, levels=4), []
+        for i in range(500):
+            t = rng.randrange(1 << 16)
+            wheel.add(t, i)
+            heapq.heappush(ref, (t, i))
+        for limit in range(0, 1 << 16, 997):
+            self.drain(wheel, ref, rng, limit=limit)
+            self.assertEqual(wheel.now, limit)
+            self.assertTrue(not ref or ref[0][0] > limit)
+        self.drain(wheel, ref, rng)
+        self.assertFalse(ref)
+
+    def test_past_tick_fires_now_and_horizon(self):
+        wheel = TimingWheel(slots=16, levels=2)
+        wheel.add(20, "a")
+        self.assertEqual(wheel.advance(), (20, ["a"]))
+        wheel.add(5, "late")
+        self.assertEqual(wheel.advance(), (20, ["late"]))
+        with self.assertRaises(ValueError):
+            wheel.add(20 + 256, "too far")
+
+
+class EventSchedulerTest(unittest.TestCase):
+
+    def test_same_tick_in_schedule_order(self):
+        ev, out = EventScheduler(), []
+        for i in range(5): ev.schedule(1.0, out.append, i)
+        ev.schedule(0.5, out.append, "first")
+        self.assertTrue(ev.run())
+        self.assertEqual(out, ["first", 0, 1, 2, 3, 4])
+        self.assertAlmostEqual(ev.now, 1.0)
+
+    def test_cancel_and_daemons(self):
+        ev, out = EventScheduler(), []
+        t = ev.schedule(1.0, out.append, "cancelled")
+        ev.schedule(2.0, out.append, "work")
+        ev.schedule(5.0, out.append, "daemon", daemon=True)
+        ev.cancel(t)
+        self.assertTrue(ev.run())
+        # The daemon alone does not keep the run going
+        self.assertEqual(out, ["work"])
+
+    def test_until(self):
+        ev, out = EventScheduler(), []
+        ev.schedule(10.0, out.append, "late")
+        self.assertFalse(ev.run(until_ms=5.0))
+        self.assertEqual(out, [])
+        self.assertTrue(ev.run())
+        self.assertEqual(out, ["late"])
+
+    def test_rejects_bad_delay(self):
+        ev = EventScheduler()
+        for delay in (-1.0, float("nan"), float("inf")):
+            with self.assertRaises(ValueError):
+                ev.schedule(delay, print)
+
+
+if __name__ == "__main__":
+    unittest.main()
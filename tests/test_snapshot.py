@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from network_logic import NetworkSimulator
+from snapshot import load_snapshot, prune_snapshots, save_snapshot, snapshot_path
+
+PROTOCOLS = ["Link-State (OSPF)", "Distance-Vector (RIP)", "Path-Vector (BGP)"]
+
+
+def make_sim(protocol, areas=False, timed=False):
+    sim = NetworkSimulator()
+    sim.protocol = protocol
+    sim.areas_enabled = areas
+    sim.timed = timed
+    return sim
+
+
+def lsdb_state(r):
+    return {oid: (l.seq_num, [tuple(n) for n in l.neighbors], l.area_id, l.is_summary)
+            for oid, l in r.lsdb.database.items()}
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def save(self, sim):
+        path = snapshot_path(sim, self.dir)
+        save_snapshot(sim, path)
+        return path
+
+    def test_round_trip(self):
+        for protocol in PROTOCOLS:
+            for areas in (False, True):
+                for timed in (False, True):
+                    with self.subTest(protocol=protocol, areas=areas, timed=timed):
+                        sim = make_sim(protocol, areas, timed)
+                        sim.run_simulation()
+                        path = self.save(sim)
+
+                        other = make_sim(protocol, areas, timed)
+                        self.assertEqual(snapshot_path(other, self.dir), path)
+                        load_snapshot(other, path)
+                        self.assertEqual(list(other.routers), sorted(sim.routers))
+                        for rid, r in sim.routers.items():
+                            loaded = other.routers[rid]
+                            self.assertEqual((loaded.x, loaded.y, loaded.area_id, loaded.is_abr),
+                                             (r.x, r.y, r.area_id, r.is_abr))
+                            self.assertEqual(loaded.routing_table, r.routing_table)
+                            self.assertEqual(lsdb_state(loaded), lsdb_state(r))
+                        self.assertEqual([(l.r1, l.r2, l.cost, l.delay, l.active) for l in other.links],
+                                         [(l.r1, l.r2, l.cost, l.delay, l.active) for l in sim.links])
+                        self.assertEqual(other.last_logs, sim.last_logs)
+                        expected = {k: v for k, v in sim.metrics.items() if k != 'timeline'}
+                        self.assertEqual(other.metrics, expected)
+                        self.assertEqual(other.topology_key(), sim.topology_key())
+
+    def test_values_and_items_walk_in_order(self):
+        sim = make_sim(PROTOCOLS[0])
+        sim.run_simulation()
+        path = self.save(sim)
+        other = make_sim(PROTOCOLS[0])
+        load_snapshot(other, path)
+        ids = sorted(sim.routers)
+        self.assertEqual([r.id for r in other.routers.values()], ids)
+        self.assertEqual([rid for rid, _ in other.routers.items()], ids)
+        self.assertIs(other.routers[ids[0]], next(iter(other.routers.values())))
+        self.assertNotIn("no such router", other.routers)
+
+    def test_truncated_file_raises(self):
+        sim = make_sim(PROTOCOLS[1])
+        sim.run_simulation()
+        path = self.save(sim)
+        with open(path, "rb") as f: data = f.read()
+        for size in (10, len(data) - 1):
+            with open(path, "wb") as f: f.write(data[:size])
+            with self.assertRaises(ValueError):
+                load_snapshot(make_sim(PROTOCOLS[1]), path)
+
+    def test_bad_magic_raises(self):
+        sim = make_sim(PROTOCOLS[0])
+        sim.run_simulation()
+        path = self.save(sim)
+        with open(path, "r+b") as f: f.write(b"XXXXXXXX")
+        with self.assertRaises(ValueError):
+            load_snapshot(make_sim(PROTOCOLS[0]), path)
+
+    def test_key_mismatch_raises(self):
+        sim = make_sim(PROTOCOLS[2])
+        sim.run_simulation()
+        path = self.save(sim)
+        other = make_sim(PROTOCOLS[2])
+        other.links[0].cost += 1
+        with self.assertRaises(ValueError):
+            load_snapshot(other, path)
+
+    def test_prune_keeps_most_recent(self):
+        for i in range(5):
+            path = os.path.join(self.dir, f"{i}.nxs")
+            open(path, "wb").close()
+            os.utime(path, (i, i))
+        open(os.path.join(self.dir, "other.txt"), "wb").close()
+        prune_snapshots(self.dir, 2)
+        self.assertEqual(sorted(os.listdir(self.dir)), ["3.nxs", "4.nxs", "other.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()